@@ -3,11 +3,13 @@
 Minimal static file server with security headers.
 Usage: python serve.py [port]
 """
-import mimetypes
+import functools
 import os
+import shutil
+import stat
 import sys
-from http.server import BaseHTTPRequestHandler, HTTPServer
-from pathlib import Path, PurePosixPath
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
 from urllib.parse import unquote
 
 SERVE_ROOT = Path(os.getcwd()).resolve()
@@ -23,6 +25,39 @@ ALLOWED_STATIC = {
 ALLOWED_JSON_SYMLINKS = {"results.json", "history.json", "health.json", "health_history.json"}
 RESULTS_ROOT = Path(os.environ.get("RESULTS_DIR", "/results")).resolve()
 
+# Content types for every suffix the allowlists can serve, keyed by lowercase
+# suffix. A static dict beats mimetypes.guess_type(), which re-parses the
+# filename and walks the registry on every request.
+CONTENT_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".js": "application/javascript",
+    ".css": "text/css",
+    ".json": "application/json",
+    ".svg": "image/svg+xml",
+    ".png": "image/png",
+    ".ico": "image/x-icon",
+    ".woff2": "font/woff2",
+}
+
+# Files up to this size are served from the in-process cache; larger files
+# are streamed with os.sendfile() (kernel-space copy, no Python bytes object)
+# where the platform supports it. Below the threshold the extra syscall setup
+# costs more than the copy it saves.
+CACHE_MAX_BYTES = 64 * 1024
+_HAS_SENDFILE = hasattr(os, "sendfile")
+
+
+@functools.lru_cache(maxsize=128)
+def _read_cached(path_str: str, mtime_ns: int, size: int) -> bytes:
+    """Read a small static file, memoized on (path, mtime_ns, size).
+
+    mtime_ns and size exist only to key the cache: when the file changes on
+    disk the stat values change, the new key misses, and the stale entry
+    ages out of the LRU. Warm hits cost a dict lookup instead of a read.
+    """
+    return Path(path_str).read_bytes()
+
+
 SECURITY_HEADERS = [
     ("X-Frame-Options", "DENY"),
     ("X-Content-Type-Options", "nosniff"),
@@ -36,14 +71,24 @@ SECURITY_HEADERS = [
     ("Referrer-Policy", "strict-origin-when-cross-origin"),
 ]
 
+# The security headers never change, so encode them once instead of formatting
+# five send_header() lines per response. Same for the two Cache-Control
+# variants. Appended to the handler's _headers_buffer before end_headers().
+_SECURITY_HEADER_BYTES = b"".join(
+    f"{name}: {value}\r\n".encode("latin-1") for name, value in SECURITY_HEADERS
+)
+_CACHE_CONTROL_JSON = b"Cache-Control: no-store\r\n"
+_CACHE_CONTROL_STATIC = b"Cache-Control: public, max-age=300\r\n"
+
 
 class SecureStaticHandler(BaseHTTPRequestHandler):
     def log_message(self, fmt, *args):
         pass  # suppress default access log
 
     def end_headers(self):
-        for name, value in SECURITY_HEADERS:
-            self.send_header(name, value)
+        if not hasattr(self, "_headers_buffer"):
+            self._headers_buffer = []
+        self._headers_buffer.append(_SECURITY_HEADER_BYTES)
         super().end_headers()
 
     def do_GET(self):
@@ -52,22 +97,31 @@ class SecureStaticHandler(BaseHTTPRequestHandler):
         if path == "/":
             path = "/index.html"
 
+        # Plain segment scan instead of a PurePosixPath/parts allocation per
+        # request. Symlink escapes are caught separately by the
+        # is_relative_to() containment checks after resolve() below.
         rel_path = path.lstrip("/")
-        parts = PurePosixPath(rel_path).parts
-        if any(part == ".." for part in parts):
+        if "\0" in rel_path or ".." in rel_path.split("/"):
             self._send_error(403)
             return
 
         # The unresolved path is always within SERVE_ROOT (.. already blocked above).
         # resolve() follows the intentional /dashboard/*.json → /results/*.json symlinks.
-        unresolved = SERVE_ROOT.joinpath(*parts)
+        unresolved = SERVE_ROOT / rel_path
         try:
             target = unresolved.resolve()
         except (OSError, ValueError):
             self._send_error(400)
             return
 
-        if not target.exists() or not target.is_file():
+        # One stat() answers existence, file-type, size, and the cache key;
+        # exists()/is_file() would each issue their own syscall.
+        try:
+            st = target.stat()
+        except OSError:
+            self._send_error(404)
+            return
+        if not stat.S_ISREG(st.st_mode):
             self._send_error(404)
             return
 
@@ -82,24 +136,61 @@ class SecureStaticHandler(BaseHTTPRequestHandler):
             self._send_error(403)
             return
 
-        content_type = mimetypes.guess_type(str(target))[0] or "application/octet-stream"
-        is_json = target.suffix.lower() == ".json"
+        # Weak ETag from mtime+size: lets repeat loads skip the body write
+        # entirely. Sent even for no-store JSON, since some clients issue
+        # conditional GETs regardless.
+        etag = f'W/"{st.st_mtime_ns:x}-{st.st_size:x}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        suffix = target.suffix.lower()
+        content_type = CONTENT_TYPES.get(suffix, "application/octet-stream")
+        is_json = suffix == ".json"
 
         try:
-            data = target.read_bytes()
+            if st.st_size <= CACHE_MAX_BYTES:
+                data = _read_cached(str(target), st.st_mtime_ns, st.st_size)
+                src = None
+            else:
+                data = None
+                src = open(target, "rb")
         except OSError:
             self._send_error(500)
             return
 
         self.send_response(200)
         self.send_header("Content-Type", content_type)
-        self.send_header("Content-Length", str(len(data)))
-        if is_json:
-            self.send_header("Cache-Control", "no-store")
-        else:
-            self.send_header("Cache-Control", "public, max-age=300")
+        self.send_header("Content-Length", str(st.st_size))
+        self.send_header("ETag", etag)
+        self._headers_buffer.append(
+            _CACHE_CONTROL_JSON if is_json else _CACHE_CONTROL_STATIC
+        )
         self.end_headers()
-        self.wfile.write(data)
+
+        if src is None:
+            self.wfile.write(data)
+            return
+
+        with src:
+            if _HAS_SENDFILE:
+                # Flush buffered headers, then copy file -> socket in kernel
+                # space without materializing the body in user space.
+                self.wfile.flush()
+                dst_fd = self.connection.fileno()
+                src_fd = src.fileno()
+                offset = 0
+                remaining = st.st_size
+                while remaining > 0:
+                    sent = os.sendfile(dst_fd, src_fd, offset, remaining)
+                    if sent == 0:
+                        break
+                    offset += sent
+                    remaining -= sent
+            else:
+                shutil.copyfileobj(src, self.wfile)
 
     def _send_error(self, code):
         reason = self.responses.get(code, ("Error",))[0]
@@ -118,6 +209,9 @@ if __name__ == "__main__":
         print("Invalid port", file=sys.stderr)
         sys.exit(1)
 
-    server = HTTPServer(("0.0.0.0", port), SecureStaticHandler)
+    # Thread-per-request so a slow JSON read cannot stall other dashboard
+    # assets. The handler only touches request-local state, so no locking is
+    # needed. daemon_threads is True by default on ThreadingHTTPServer.
+    server = ThreadingHTTPServer(("0.0.0.0", port), SecureStaticHandler)
     print(f"Serving {SERVE_ROOT} on port {port}", flush=True)
     server.serve_forever()
@@ -46,10 +46,11 @@ def server(dirs, monkeypatch):
     srv.shutdown()
 
 
-def get(base, path):
+def get(base, path, headers=None):
     """Make a GET request, return (status, headers_dict, body_bytes)."""
+    req = urllib.request.Request(f"{base}{path}", headers=headers or {})
     try:
-        with urllib.request.urlopen(f"{base}{path}") as resp:
+        with urllib.request.urlopen(req) as resp:
             return resp.status, {k.lower(): v for k, v in resp.headers.items()}, resp.read()
     except urllib.error.HTTPError as e:
         return e.code, {k.lower(): v for k, v in e.headers.items()}, e.read()
@@ -159,6 +160,40 @@ class TestAllowlist:
         assert code == 403
 
 
+# ---------------------------------------------------------------------------
+# File cache
+# ---------------------------------------------------------------------------
+
+class TestFileCache:
+    def test_repeated_requests_serve_same_content(self, server):
+        base, dashboard_dir, _ = server
+        (dashboard_dir / "index.html").write_text("<html>v1</html>")
+        _, _, body1 = get(base, "/index.html")
+        _, _, body2 = get(base, "/index.html")
+        assert body1 == body2 == b"<html>v1</html>"
+
+    def test_modified_file_invalidates_cache(self, server):
+        """A changed mtime/size must produce a cache miss, not stale bytes."""
+        base, dashboard_dir, _ = server
+        path = dashboard_dir / "index.html"
+        path.write_text("<html>v1</html>")
+        get(base, "/index.html")
+        path.write_text("<html>v2 updated</html>")
+        _, _, body = get(base, "/index.html")
+        assert body == b"<html>v2 updated</html>"
+
+    def test_large_file_served_intact(self, server):
+        """Files above CACHE_MAX_BYTES take the sendfile/stream path."""
+        base, dashboard_dir, results_dir = server
+        payload = b'{"data": "' + b"x" * (serve.CACHE_MAX_BYTES + 1024) + b'"}'
+        (results_dir / "history.json").write_bytes(payload)
+        (dashboard_dir / "history.json").symlink_to(results_dir / "history.json")
+        code, headers, body = get(base, "/history.json")
+        assert code == 200
+        assert headers["content-length"] == str(len(payload))
+        assert body == payload
+
+
 # ---------------------------------------------------------------------------
 # Security headers
 # ---------------------------------------------------------------------------
@@ -185,6 +220,39 @@ class TestSecurityHeaders:
         assert "content-security-policy" in headers
 
 
+# ---------------------------------------------------------------------------
+# Conditional requests (ETag / If-None-Match)
+# ---------------------------------------------------------------------------
+
+class TestConditionalRequests:
+    def test_response_includes_etag(self, server):
+        base, dashboard_dir, _ = server
+        (dashboard_dir / "index.html").write_text("<html></html>")
+        code, headers, _ = get(base, "/index.html")
+        assert code == 200
+        assert headers.get("etag", "").startswith('W/"')
+
+    def test_matching_etag_returns_304(self, server):
+        base, dashboard_dir, _ = server
+        (dashboard_dir / "index.html").write_text("<html></html>")
+        _, headers, _ = get(base, "/index.html")
+        code, headers2, body = get(
+            base, "/index.html", headers={"If-None-Match": headers["etag"]}
+        )
+        assert code == 304
+        assert headers2.get("etag") == headers["etag"]
+        assert body == b""
+
+    def test_stale_etag_returns_full_body(self, server):
+        base, dashboard_dir, _ = server
+        (dashboard_dir / "index.html").write_text("<html></html>")
+        code, _, body = get(
+            base, "/index.html", headers={"If-None-Match": 'W/"dead-beef"'}
+        )
+        assert code == 200
+        assert body == b"<html></html>"
+
+
 # ---------------------------------------------------------------------------
 # Cache-Control headers
 # ---------------------------------------------------------------------------
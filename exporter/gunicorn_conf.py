@@ -0,0 +1,12 @@
+"""Gunicorn configuration for the Rally exporter.
+
+Two gthread workers with four threads each keep /metrics responsive when
+multiple Prometheus servers (HA pairs) scrape concurrently; a single sync
+worker would serialize the scrapes. The bind address is set on the command
+line by entrypoint.sh so EXPORTER_PORT stays the single source of truth.
+"""
+
+workers = 2
+threads = 4
+worker_class = "gthread"
+timeout = 30
@@ -8,18 +8,46 @@ Reads JSON results from the /results directory and serves metrics on :9101.
 
 import json
 import os
+import threading
 import time
+import types
+from collections import defaultdict
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
-from flask import Flask, Response, jsonify
 from prometheus_client import (
     Counter,
     CollectorRegistry,
-    Gauge,
     generate_latest,
     CONTENT_TYPE_LATEST,
 )
+from prometheus_client.core import GaugeMetricFamily
+
+# orjson's C parser decodes the result files several times faster than the
+# stdlib json module; fall back to stdlib when it is not installed. Both
+# raise ValueError subclasses on malformed input.
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj):
+        return json.dumps(obj).encode("utf-8")
+
+# ijson streams large summary files instead of materializing the whole parse
+# tree; optional like orjson. Its decode errors do not subclass ValueError,
+# so they are folded into the loaders' error tuple here.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+_LOAD_ERRORS = (FileNotFoundError, ValueError, OSError)
+if ijson is not None:
+    _LOAD_ERRORS = _LOAD_ERRORS + (ijson.JSONError,)
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -28,101 +56,13 @@ RESULTS_DIR = os.environ.get("RESULTS_DIR", "/results")
 EXPORTER_PORT = int(os.environ.get("EXPORTER_PORT", 9101))
 READY_MAX_AGE_MINUTES = int(os.environ.get("READY_MAX_AGE_MINUTES", 480))
 
-app = Flask(__name__)
-
 # ---------------------------------------------------------------------------
 # Prometheus Metrics Registry
 # ---------------------------------------------------------------------------
 registry = CollectorRegistry()
 
-rally_task_success = Gauge(
-    "rally_task_success",
-    "Whether the Rally task passed (1) or failed (0)",
-    ["service", "scenario"],
-    registry=registry,
-)
-
-rally_task_duration_seconds = Gauge(
-    "rally_task_duration_seconds",
-    "Duration of the Rally task in seconds",
-    ["service", "scenario"],
-    registry=registry,
-)
-
-rally_task_iterations_total = Gauge(
-    "rally_task_iterations_total",
-    "Total number of iterations in the Rally task",
-    ["service", "scenario"],
-    registry=registry,
-)
-
-rally_task_failures_total = Gauge(
-    "rally_task_failures_total",
-    "Number of failed iterations in the Rally task",
-    ["service", "scenario"],
-    registry=registry,
-)
-
-rally_task_sla_passed = Gauge(
-    "rally_task_sla_passed",
-    "Whether the SLA check passed (1) or failed (0)",
-    ["service", "scenario"],
-    registry=registry,
-)
-
-rally_service_status = Gauge(
-    "rally_service_status",
-    "Overall service status: 1=passed, 0=failed, -1=pending/skipped",
-    ["service"],
-    registry=registry,
-)
-
-rally_cleanup_failure = Gauge(
-    "rally_cleanup_failure",
-    "Whether scenario-created (s_rally_*) cleanup failed (1) or succeeded (0)",
-    ["service"],
-    registry=registry,
-)
-
-rally_orphaned_resources = Gauge(
-    "rally_orphaned_resources",
-    "Number of scenario-created (s_rally_*) orphaned resources",
-    ["service", "resource_type"],
-    registry=registry,
-)
-
-rally_context_cleanup_warning = Gauge(
-    "rally_context_cleanup_warning",
-    "Whether context-created (c_rally_*) resources were left behind (1) or not (0)",
-    ["service"],
-    registry=registry,
-)
-
-rally_context_orphaned_resources = Gauge(
-    "rally_context_orphaned_resources",
-    "Number of context-created (c_rally_*) orphaned resources",
-    ["service", "resource_type"],
-    registry=registry,
-)
-
-rally_last_run_timestamp = Gauge(
-    "rally_last_run_timestamp",
-    "Epoch timestamp of the last Rally test run",
-    registry=registry,
-)
-
-rally_overall_success = Gauge(
-    "rally_overall_success",
-    "Whether all services passed (1) or any failed (0)",
-    registry=registry,
-)
-
-rally_run_duration_seconds = Gauge(
-    "rally_run_duration_seconds",
-    "Total duration of the last full Rally test suite run in seconds",
-    registry=registry,
-)
-
+# The only stateful metric: error counts must survive across scrapes. All
+# gauge metrics are generated per scrape by RallyCollector below.
 rally_exporter_errors_total = Counter(
     "rally_exporter_errors_total",
     "Total number of errors reading or parsing result files",
@@ -130,12 +70,6 @@ rally_exporter_errors_total = Counter(
     registry=registry,
 )
 
-rally_data_valid = Gauge(
-    "rally_data_valid",
-    "Whether valid test result data is available (1) or not (0)",
-    registry=registry,
-)
-
 
 # ---------------------------------------------------------------------------
 # File Cache State
@@ -145,6 +79,15 @@ rally_data_valid = Gauge(
 # ---------------------------------------------------------------------------
 CACHE_MAX_AGE_SECONDS: float = 60.0
 
+# Summaries above this size are stream-parsed (when ijson is available),
+# keeping only the fields the exporter consumes. Below it, a full
+# orjson/json decode is faster than the streaming event machinery.
+STREAM_MIN_BYTES: int = 64 * 1024
+
+# Serializes cache reads/updates so concurrent scrapes (threaded server)
+# cannot interleave a partial cache update with a read.
+_cache_lock = threading.Lock()
+
 _summary_mtime: float = -1.0
 _summary_data: dict = {}
 _summary_cache_time: float = 0.0
@@ -153,30 +96,67 @@ _cleanup_mtime: float = -1.0
 _cleanup_data: dict = {}
 _cleanup_cache_time: float = 0.0
 
-# Tracks the timestamp of the last summary we processed into labeled metrics.
-# Only when this changes do we clear and rebuild per-service/scenario gauges.
-_last_processed_ts: str = ""
-
 
 # ---------------------------------------------------------------------------
 # Data Loading
 # ---------------------------------------------------------------------------
+def _load_summary_streaming(summary_file: str) -> dict:
+    """Stream-parse a large summary, keeping only the fields the exporter uses.
+
+    Big summaries are dominated by per-scenario payloads (error details, raw
+    Rally output) that metrics never read. ijson walks the file one service
+    at a time, so peak memory is bounded by the pruned dict plus a single
+    service entry instead of the full parse tree. ijson yields Decimal for
+    non-integer numbers, hence the float/int coercion.
+    """
+    data = {"timestamp": "none", "services": {}}
+    with open(summary_file, "rb") as f:
+        for service, svc_data in ijson.kvitems(f, "services"):
+            data["services"][service] = {
+                "status": svc_data.get("status", "pending"),
+                "scenarios": [
+                    {
+                        "name": scenario.get("name", "unknown"),
+                        "duration": float(scenario.get("duration", 0)),
+                        "iterations": int(scenario.get("iterations", 0)),
+                        "failures": int(scenario.get("failures", 0)),
+                        "sla": scenario.get("sla", False),
+                    }
+                    for scenario in svc_data.get("scenarios", [])
+                ],
+            }
+        # Second lightweight pass for the top-level scalars; still streaming,
+        # nothing beyond single tokens is materialized.
+        f.seek(0)
+        for prefix, event, value in ijson.parse(f):
+            if prefix == "timestamp" and event == "string":
+                data["timestamp"] = value
+            elif prefix == "run_duration_seconds" and event == "number":
+                data["run_duration_seconds"] = float(value)
+    return data
+
+
 def load_latest_summary() -> dict:
     """Load the latest summary JSON file, using mtime-based caching."""
     global _summary_mtime, _summary_data, _summary_cache_time
     summary_file = os.path.join(RESULTS_DIR, "latest_summary.json")
     try:
-        mtime = os.path.getmtime(summary_file)
-        now = time.time()
-        if mtime == _summary_mtime and (now - _summary_cache_time) < CACHE_MAX_AGE_SECONDS:
-            return _summary_data
-        with open(summary_file, "r") as f:
-            data = json.load(f)
-        _summary_data = data
-        _summary_mtime = mtime
-        _summary_cache_time = now
-        return data
-    except (FileNotFoundError, json.JSONDecodeError, OSError):
+        with _cache_lock:
+            st = os.stat(summary_file)
+            mtime = st.st_mtime
+            now = time.time()
+            if mtime == _summary_mtime and (now - _summary_cache_time) < CACHE_MAX_AGE_SECONDS:
+                return _summary_data
+            if ijson is not None and st.st_size > STREAM_MIN_BYTES:
+                data = _load_summary_streaming(summary_file)
+            else:
+                with open(summary_file, "rb") as f:
+                    data = _json_loads(f.read())
+            _summary_data = data
+            _summary_mtime = mtime
+            _summary_cache_time = now
+            return data
+    except _LOAD_ERRORS:
         rally_exporter_errors_total.labels(file="latest_summary.json").inc()
         return {"timestamp": "none", "services": {}}
 
@@ -186,35 +166,48 @@ def load_cleanup_metrics() -> dict:
     global _cleanup_mtime, _cleanup_data, _cleanup_cache_time
     metrics_file = os.path.join(RESULTS_DIR, "cleanup_metrics.json")
     try:
-        mtime = os.path.getmtime(metrics_file)
-        now = time.time()
-        if mtime == _cleanup_mtime and (now - _cleanup_cache_time) < CACHE_MAX_AGE_SECONDS:
-            return _cleanup_data
-        with open(metrics_file, "r") as f:
-            data = json.load(f)
-        _cleanup_data = data
-        _cleanup_mtime = mtime
-        _cleanup_cache_time = now
-        return data
-    except (FileNotFoundError, json.JSONDecodeError, OSError):
+        with _cache_lock:
+            mtime = os.path.getmtime(metrics_file)
+            now = time.time()
+            if mtime == _cleanup_mtime and (now - _cleanup_cache_time) < CACHE_MAX_AGE_SECONDS:
+                return _cleanup_data
+            with open(metrics_file, "rb") as f:
+                data = _json_loads(f.read())
+            _cleanup_data = data
+            _cleanup_mtime = mtime
+            _cleanup_cache_time = now
+            return data
+    except _LOAD_ERRORS:
         rally_exporter_errors_total.labels(file="cleanup_metrics.json").inc()
         return {"cleanup_failed": 0, "orphaned_resources": {}, "details": {}}
 
 
 
 def parse_timestamp(ts: str) -> float:
-    """Convert Rally timestamp string to epoch."""
+    """Convert Rally timestamp string (YYYYMMDDTHHMMSSZ) to epoch.
+
+    The format is fixed at 16 characters, so slicing + int() beats
+    datetime.strptime(), which re-interprets the format string per call.
+    """
     try:
-        dt = datetime.strptime(ts, "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+        if len(ts) != 16 or ts[8] != "T" or ts[15] != "Z":
+            return 0.0
+        dt = datetime(
+            int(ts[0:4]), int(ts[4:6]), int(ts[6:8]),
+            int(ts[9:11]), int(ts[11:13]), int(ts[13:15]),
+            tzinfo=timezone.utc,
+        )
         return dt.timestamp()
     except (ValueError, TypeError):
         return 0.0
 
 
 # ---------------------------------------------------------------------------
-# Metrics Update
+# Metrics Collection
 # ---------------------------------------------------------------------------
-_SVC_MAP: dict = {
+# Maps cleanup resource types to owning services. Built once at import and
+# wrapped in a read-only proxy so scrape-path code cannot mutate it.
+_SVC_MAP = types.MappingProxyType({
     "servers": "nova",
     "networks": "neutron",
     "routers": "neutron",
@@ -223,169 +216,187 @@ _SVC_MAP: dict = {
     "images": "glance",
     "users": "keystone",
     "projects": "keystone",
-}
-
-
-def _apply_cleanup_metrics(cleanup: dict) -> None:
-    """Apply cleanup orphan metrics from cleanup_metrics.json.
-
-    Called on every scrape regardless of whether the summary timestamp changed,
-    because cleanup_metrics.json has its own independent update cycle (written
-    after each test run by cleanup_monitor.sh).
-    """
-    # Scenario-created (s_rally_*) orphan metrics — warning/critical severity
-    orphaned = cleanup.get("orphaned_resources", {})
-    for service, count in orphaned.items():
-        rally_cleanup_failure.labels(service=service).set(1 if count > 0 else 0)
-        rally_orphaned_resources.labels(service=service, resource_type="total").set(count)
-
-    for resource_type, count in cleanup.get("details", {}).items():
-        svc = _SVC_MAP.get(resource_type, "unknown")
-        rally_orphaned_resources.labels(service=svc, resource_type=resource_type).set(count)
+})
 
-    # Context-created (c_rally_*) orphan metrics — info severity
-    context_orphaned = cleanup.get("context_orphaned_resources", {})
-    for service, count in context_orphaned.items():
-        rally_context_cleanup_warning.labels(service=service).set(1 if count > 0 else 0)
-        rally_context_orphaned_resources.labels(service=service, resource_type="total").set(count)
 
-    for resource_type, count in cleanup.get("context_details", {}).items():
-        svc = _SVC_MAP.get(resource_type, "unknown")
-        rally_context_orphaned_resources.labels(service=svc, resource_type=resource_type).set(count)
+class RallyCollector:
+    """Builds all Rally gauge metric families directly from the result files.
 
+    Registered as a custom collector: collect() runs on each /metrics scrape
+    and yields fresh GaugeMetricFamily objects, bypassing the Gauge-child
+    machinery (per-label locks, hashing, clear/rebuild) entirely. Metric
+    state lives only in the mtime-cached JSON files.
 
-def update_metrics():
-    """Read latest results and update all Prometheus metrics.
-
-    Cleanup metrics (rally_cleanup_failure, rally_orphaned_resources, etc.) are
-    updated on every scrape because cleanup_metrics.json changes independently of
-    the summary timestamp (written after each run by cleanup_monitor.sh).
-
-    Summary-derived labeled metrics (per-service, per-scenario) are only cleared
-    and rebuilt when the summary timestamp changes, to avoid transient metric gaps.
-
-    rally_data_valid and rally_overall_success are always updated to reflect the
-    current validity of the data.
+    Cleanup metrics (rally_cleanup_failure, rally_orphaned_resources, etc.)
+    are emitted even when the summary is missing or stale, because
+    cleanup_metrics.json has its own independent update cycle (written after
+    each test run by cleanup_monitor.sh).
     """
-    global _last_processed_ts
 
-    summary = load_latest_summary()
-    cleanup = load_cleanup_metrics()
-
-    services = summary.get("services", {})
-    current_ts = summary.get("timestamp", "")
-    is_valid = bool(services) and current_ts not in ("none", "waiting_for_first_run", "")
-
-    # Cleanup metrics are always applied — they come from a separate file
-    # with its own update cycle (written after each run by cleanup_monitor.sh).
-    # Apply them before the validity check so orphan signals remain current
-    # even when the summary file is missing or stale.
-    _apply_cleanup_metrics(cleanup)
-
-    if not is_valid:
-        # No usable data: signal invalidity without disturbing labeled metrics.
-        rally_data_valid.set(0)
-        rally_overall_success.set(0)
-        return
-
-    rally_data_valid.set(1)
-
-    # run_duration_seconds is written to the summary file after the test run
-    # completes, potentially with the same timestamp as the initial write.
-    # Update it on every valid scrape so corrections are never missed.
-    run_duration = summary.get("run_duration_seconds", 0)
-    if run_duration > 0:
-        rally_run_duration_seconds.set(run_duration)
-
-    # If the summary timestamp hasn't changed, summary-derived labeled metrics
-    # are already up-to-date. Skip the clear+rebuild to avoid transient gaps.
-    if current_ts == _last_processed_ts:
-        return
-
-    _last_processed_ts = current_ts
-
-    # New data: clear only summary-derived labeled metrics, then rebuild.
-    for metric in [
-        rally_task_success,
-        rally_task_duration_seconds,
-        rally_task_iterations_total,
-        rally_task_failures_total,
-        rally_task_sla_passed,
-        rally_service_status,
-    ]:
-        metric.clear()
-
-    # Update last run timestamp
-    ts = parse_timestamp(current_ts)
-    if ts > 0:
-        rally_last_run_timestamp.set(ts)
-
-    # Per-service metrics
-    all_passed = True
-    for service, data in services.items():
-        status = data.get("status", "pending")
-
-        if status == "passed":
-            rally_service_status.labels(service=service).set(1)
-        elif status == "failed":
-            rally_service_status.labels(service=service).set(0)
-            all_passed = False
-        else:
-            rally_service_status.labels(service=service).set(-1)
-
-        # Per-scenario metrics
-        for scenario in data.get("scenarios", []):
-            name = scenario.get("name", "unknown")
-            rally_task_duration_seconds.labels(
-                service=service, scenario=name
-            ).set(scenario.get("duration", 0))
-
-            rally_task_iterations_total.labels(
-                service=service, scenario=name
-            ).set(scenario.get("iterations", 0))
-
-            failures = scenario.get("failures", 0)
-            rally_task_failures_total.labels(
-                service=service, scenario=name
-            ).set(failures)
-
-            passed = 1 if failures == 0 else 0
-            rally_task_success.labels(
-                service=service, scenario=name
-            ).set(passed)
-            if not passed:
-                all_passed = False
-
-            sla = 1 if scenario.get("sla", False) else 0
-            rally_task_sla_passed.labels(
-                service=service, scenario=name
-            ).set(sla)
-
-    rally_overall_success.set(1 if all_passed else 0)
+    def collect(self):
+        summary = load_latest_summary()
+        cleanup = load_cleanup_metrics()
+
+        task_success = GaugeMetricFamily(
+            "rally_task_success",
+            "Whether the Rally task passed (1) or failed (0)",
+            labels=["service", "scenario"],
+        )
+        task_duration = GaugeMetricFamily(
+            "rally_task_duration_seconds",
+            "Duration of the Rally task in seconds",
+            labels=["service", "scenario"],
+        )
+        task_iterations = GaugeMetricFamily(
+            "rally_task_iterations_total",
+            "Total number of iterations in the Rally task",
+            labels=["service", "scenario"],
+        )
+        task_failures = GaugeMetricFamily(
+            "rally_task_failures_total",
+            "Number of failed iterations in the Rally task",
+            labels=["service", "scenario"],
+        )
+        task_sla = GaugeMetricFamily(
+            "rally_task_sla_passed",
+            "Whether the SLA check passed (1) or failed (0)",
+            labels=["service", "scenario"],
+        )
+        service_status = GaugeMetricFamily(
+            "rally_service_status",
+            "Overall service status: 1=passed, 0=failed, -1=pending/skipped",
+            labels=["service"],
+        )
+        cleanup_failure = GaugeMetricFamily(
+            "rally_cleanup_failure",
+            "Whether scenario-created (s_rally_*) cleanup failed (1) or succeeded (0)",
+            labels=["service"],
+        )
+        orphaned_resources = GaugeMetricFamily(
+            "rally_orphaned_resources",
+            "Number of scenario-created (s_rally_*) orphaned resources",
+            labels=["service", "resource_type"],
+        )
+        context_warning = GaugeMetricFamily(
+            "rally_context_cleanup_warning",
+            "Whether context-created (c_rally_*) resources were left behind (1) or not (0)",
+            labels=["service"],
+        )
+        context_orphaned = GaugeMetricFamily(
+            "rally_context_orphaned_resources",
+            "Number of context-created (c_rally_*) orphaned resources",
+            labels=["service", "resource_type"],
+        )
+        last_run = GaugeMetricFamily(
+            "rally_last_run_timestamp",
+            "Epoch timestamp of the last Rally test run",
+        )
+        overall_success = GaugeMetricFamily(
+            "rally_overall_success",
+            "Whether all services passed (1) or any failed (0)",
+        )
+        run_duration = GaugeMetricFamily(
+            "rally_run_duration_seconds",
+            "Total duration of the last full Rally test suite run in seconds",
+        )
+        data_valid = GaugeMetricFamily(
+            "rally_data_valid",
+            "Whether valid test result data is available (1) or not (0)",
+        )
+
+        # Fuse the four cleanup sections into one aggregate keyed by service,
+        # then emit every cleanup family in a single loop, instead of four
+        # independent passes over overlapping service keys.
+        # s_* = scenario-created (s_rally_*, warning/critical severity),
+        # c_* = context-created (c_rally_*, info severity).
+        agg = defaultdict(lambda: {
+            "s_total": None, "c_total": None, "s_types": [], "c_types": [],
+        })
+        for service, count in cleanup.get("orphaned_resources", {}).items():
+            agg[service]["s_total"] = count
+        for resource_type, count in cleanup.get("details", {}).items():
+            agg[_SVC_MAP.get(resource_type, "unknown")]["s_types"].append(
+                (resource_type, count)
+            )
+        for service, count in cleanup.get("context_orphaned_resources", {}).items():
+            agg[service]["c_total"] = count
+        for resource_type, count in cleanup.get("context_details", {}).items():
+            agg[_SVC_MAP.get(resource_type, "unknown")]["c_types"].append(
+                (resource_type, count)
+            )
+
+        for service, entry in agg.items():
+            s_total = entry["s_total"]
+            if s_total is not None:
+                cleanup_failure.add_metric([service], 1 if s_total > 0 else 0)
+                orphaned_resources.add_metric([service, "total"], s_total)
+            for resource_type, count in entry["s_types"]:
+                orphaned_resources.add_metric([service, resource_type], count)
+            c_total = entry["c_total"]
+            if c_total is not None:
+                context_warning.add_metric([service], 1 if c_total > 0 else 0)
+                context_orphaned.add_metric([service, "total"], c_total)
+            for resource_type, count in entry["c_types"]:
+                context_orphaned.add_metric([service, resource_type], count)
+
+        services = summary.get("services", {})
+        current_ts = summary.get("timestamp", "")
+        is_valid = bool(services) and current_ts not in ("none", "waiting_for_first_run", "")
+
+        all_passed = True
+        if is_valid:
+            last_run.add_metric([], parse_timestamp(current_ts))
+            run_duration.add_metric([], summary.get("run_duration_seconds", 0))
+
+            for service, data in services.items():
+                status = data.get("status", "pending")
+                if status == "passed":
+                    service_status.add_metric([service], 1)
+                elif status == "failed":
+                    service_status.add_metric([service], 0)
+                    all_passed = False
+                else:
+                    service_status.add_metric([service], -1)
+
+                for scenario in data.get("scenarios", []):
+                    label_values = [service, scenario.get("name", "unknown")]
+                    task_duration.add_metric(label_values, scenario.get("duration", 0))
+                    task_iterations.add_metric(label_values, scenario.get("iterations", 0))
+                    failures = scenario.get("failures", 0)
+                    task_failures.add_metric(label_values, failures)
+                    passed = 1 if failures == 0 else 0
+                    task_success.add_metric(label_values, passed)
+                    if not passed:
+                        all_passed = False
+                    task_sla.add_metric(label_values, 1 if scenario.get("sla", False) else 0)
+
+        data_valid.add_metric([], 1 if is_valid else 0)
+        overall_success.add_metric([], 1 if (is_valid and all_passed) else 0)
+
+        yield task_success
+        yield task_duration
+        yield task_iterations
+        yield task_failures
+        yield task_sla
+        yield service_status
+        yield cleanup_failure
+        yield orphaned_resources
+        yield context_warning
+        yield context_orphaned
+        yield last_run
+        yield overall_success
+        yield run_duration
+        yield data_valid
+
+
+registry.register(RallyCollector())
 
 
 # ---------------------------------------------------------------------------
-# Flask Routes
+# WSGI Application
 # ---------------------------------------------------------------------------
-@app.route("/metrics")
-def metrics():
-    """Prometheus metrics endpoint."""
-    update_metrics()
-    return Response(
-        generate_latest(registry),
-        mimetype=CONTENT_TYPE_LATEST,
-    )
-
-
-@app.route("/health")
-def health():
-    """Health check endpoint."""
-    return jsonify({"status": "ok", "timestamp": time.time()})
-
-
-@app.route("/ready")
-def ready():
-    """Readiness check endpoint."""
+def _ready_status() -> tuple:
+    """Compute the readiness payload and HTTP status code."""
     summary = load_latest_summary()
     reasons = []
 
@@ -413,20 +424,65 @@ def ready():
         reasons.append("all_services_pending")
 
     if reasons:
-        return jsonify({"ready": False, "reasons": reasons}), 503
+        return {"ready": False, "reasons": reasons}, 503
+
+    return {
+        "ready": True,
+        "timestamp": timestamp,
+        "age_minutes": round(age_minutes, 2),
+    }, 200
+
 
-    return jsonify(
-        {
-            "ready": True,
-            "timestamp": timestamp,
-            "age_minutes": round(age_minutes, 2),
-        }
-    ), 200
+def app(environ, start_response):
+    """Minimal WSGI application serving /metrics, /health, and /ready.
+
+    A raw WSGI callable instead of Flask: the hottest endpoint only writes
+    pre-generated bytes, so the per-request Werkzeug request/response object
+    construction and routing machinery would be pure overhead. Served by
+    gunicorn in the container (see gunicorn_conf.py).
+    """
+    path = environ.get("PATH_INFO", "/")
+    if path == "/metrics":
+        # RallyCollector runs during generation
+        status = "200 OK"
+        content_type = CONTENT_TYPE_LATEST
+        body = generate_latest(registry)
+    elif path == "/health":
+        status = "200 OK"
+        content_type = "application/json"
+        body = _json_dumps({"status": "ok", "timestamp": time.time()})
+    elif path == "/ready":
+        payload, code = _ready_status()
+        status = "200 OK" if code == 200 else "503 Service Unavailable"
+        content_type = "application/json"
+        body = _json_dumps(payload)
+    else:
+        status = "404 Not Found"
+        content_type = "application/json"
+        body = _json_dumps({"error": "not found"})
+
+    start_response(status, [
+        ("Content-Type", content_type),
+        ("Content-Length", str(len(body))),
+    ])
+    return [body]
 
 
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
 if __name__ == "__main__":
+    # Local development entry point. In the container the exporter runs under
+    # gunicorn (see gunicorn_conf.py); the threading mixin keeps concurrent
+    # scrapes from serializing on the wsgiref dev server too.
+    from socketserver import ThreadingMixIn
+    from wsgiref.simple_server import WSGIServer, make_server
+
+    class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+        daemon_threads = True
+
     print(f"Rally Exporter starting on port {EXPORTER_PORT}...")
-    app.run(host="0.0.0.0", port=EXPORTER_PORT, debug=False)
+    with make_server(
+        "0.0.0.0", EXPORTER_PORT, app, server_class=_ThreadingWSGIServer
+    ) as server:
+        server.serve_forever()
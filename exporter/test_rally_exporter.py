@@ -55,39 +55,52 @@ def metrics_output():
     return generate_latest(exporter.registry).decode()
 
 
+class WSGIResponse:
+    """Response wrapper returned by WSGIClient.get."""
+
+    def __init__(self, status, headers, body):
+        self.status_code = int(status.split()[0])
+        self.headers = headers
+        self.data = body
+        self.content_type = headers.get("Content-Type", "")
+
+    def get_json(self):
+        return json.loads(self.data)
+
+
+class WSGIClient:
+    """Just enough of a test client to exercise the raw WSGI app."""
+
+    def get(self, path):
+        captured = {}
+
+        def start_response(status, headers):
+            captured["status"] = status
+            captured["headers"] = dict(headers)
+
+        environ = {"REQUEST_METHOD": "GET", "PATH_INFO": path}
+        body = b"".join(exporter.app(environ, start_response))
+        return WSGIResponse(captured["status"], captured["headers"], body)
+
+
 # ---------------------------------------------------------------------------
 # Fixtures
 # ---------------------------------------------------------------------------
 
 @pytest.fixture(autouse=True)
 def reset_module_state():
-    """Reset module-level cache and metric state between tests."""
+    """Reset module-level file cache state between tests.
+
+    Gauge metrics carry no state between scrapes (RallyCollector rebuilds
+    them from the result files on each collect), so only the file caches
+    need resetting.
+    """
     exporter._summary_mtime = -1.0
     exporter._summary_data = {}
     exporter._summary_cache_time = 0.0
     exporter._cleanup_mtime = -1.0
     exporter._cleanup_data = {}
     exporter._cleanup_cache_time = 0.0
-    exporter._last_processed_ts = ""
-    # Reset scalar metrics
-    exporter.rally_data_valid.set(0)
-    exporter.rally_overall_success.set(0)
-    exporter.rally_last_run_timestamp.set(0)
-    exporter.rally_run_duration_seconds.set(0)
-    # Clear labeled metrics
-    for m in [
-        exporter.rally_task_success,
-        exporter.rally_task_duration_seconds,
-        exporter.rally_task_iterations_total,
-        exporter.rally_task_failures_total,
-        exporter.rally_task_sla_passed,
-        exporter.rally_service_status,
-        exporter.rally_cleanup_failure,
-        exporter.rally_orphaned_resources,
-        exporter.rally_context_cleanup_warning,
-        exporter.rally_context_orphaned_resources,
-    ]:
-        m.clear()
     yield
 
 
@@ -100,10 +113,8 @@ def results_dir(tmp_path, monkeypatch):
 
 @pytest.fixture
 def client():
-    """Flask test client."""
-    exporter.app.config["TESTING"] = True
-    with exporter.app.test_client() as c:
-        yield c
+    """WSGI test client."""
+    return WSGIClient()
 
 
 # ---------------------------------------------------------------------------
@@ -170,6 +181,24 @@ class TestLoadLatestSummary:
         result = exporter.load_latest_summary()
         assert result["timestamp"] == "20240101T120000Z"  # original cached value
 
+    def test_large_file_uses_streaming_parse(self, results_dir):
+        """Summaries above STREAM_MIN_BYTES are stream-parsed and pruned."""
+        pytest.importorskip("ijson")
+        summary = make_summary()
+        # Pad a scenario with a payload the metrics never read
+        summary["services"]["nova"]["scenarios"][0]["error_output"] = (
+            "x" * (exporter.STREAM_MIN_BYTES + 1024)
+        )
+        (results_dir / "latest_summary.json").write_text(json.dumps(summary))
+        result = exporter.load_latest_summary()
+        assert result["timestamp"] == "20240101T120000Z"
+        assert result["run_duration_seconds"] == 10.0
+        scenario = result["services"]["nova"]["scenarios"][0]
+        assert scenario["name"] == "CreateDeleteServer"
+        assert scenario["failures"] == 0
+        # The padding field is dropped by the streaming parser
+        assert "error_output" not in scenario
+
     def test_reloads_when_mtime_changes(self, results_dir):
         """File is re-read when mtime changes."""
         path = results_dir / "latest_summary.json"
@@ -204,13 +233,12 @@ class TestLoadCleanupMetrics:
 
 
 # ---------------------------------------------------------------------------
-# update_metrics — CQ-08 regression tests
+# RallyCollector — CQ-08 regression tests
 # ---------------------------------------------------------------------------
 
-class TestUpdateMetrics:
+class TestCollectedMetrics:
     def test_missing_file_sets_data_invalid(self, results_dir):
         """CQ-08: Missing summary file must not report success."""
-        exporter.update_metrics()
         output = metrics_output()
         assert "rally_data_valid 0.0" in output
         assert "rally_overall_success 0.0" in output
@@ -219,7 +247,6 @@ class TestUpdateMetrics:
         """CQ-08: Summary with empty services must not report success."""
         summary = {"timestamp": "20240101T120000Z", "services": {}}
         (results_dir / "latest_summary.json").write_text(json.dumps(summary))
-        exporter.update_metrics()
         output = metrics_output()
         assert "rally_data_valid 0.0" in output
         assert "rally_overall_success 0.0" in output
@@ -240,7 +267,6 @@ class TestUpdateMetrics:
             },
         }
         (results_dir / "latest_summary.json").write_text(json.dumps(summary))
-        exporter.update_metrics()
         output = metrics_output()
         assert "rally_data_valid 0.0" in output
         assert "rally_overall_success 0.0" in output
@@ -248,7 +274,6 @@ class TestUpdateMetrics:
     def test_valid_passing_data_reports_success(self, results_dir):
         """Valid summary with all services passing → success=1, data_valid=1."""
         (results_dir / "latest_summary.json").write_text(json.dumps(make_summary()))
-        exporter.update_metrics()
         output = metrics_output()
         assert "rally_data_valid 1.0" in output
         assert "rally_overall_success 1.0" in output
@@ -267,29 +292,24 @@ class TestUpdateMetrics:
             }
         })
         (results_dir / "latest_summary.json").write_text(json.dumps(summary))
-        exporter.update_metrics()
         output = metrics_output()
         assert "rally_overall_success 0.0" in output
         assert "rally_data_valid 1.0" in output
 
-    def test_labeled_metrics_retained_on_same_timestamp(self, results_dir):
-        """CQ-04: Labeled metrics are not cleared when timestamp is unchanged."""
+    def test_labeled_metrics_stable_on_same_timestamp(self, results_dir):
+        """CQ-04: Repeated scrapes of unchanged data yield the same series."""
         path = results_dir / "latest_summary.json"
         path.write_text(json.dumps(make_summary()))
-        exporter.update_metrics()
-        # Confirm service metric is set
         output1 = metrics_output()
         assert 'rally_service_status{service="nova"} 1.0' in output1
         # Second scrape with same timestamp — metrics should stay
-        exporter.update_metrics()
         output2 = metrics_output()
         assert 'rally_service_status{service="nova"} 1.0' in output2
 
     def test_labeled_metrics_rebuilt_on_new_timestamp(self, results_dir):
-        """CQ-04: Labeled metrics are rebuilt when timestamp changes."""
+        """CQ-04: Labeled metrics follow the data when a new run lands."""
         path = results_dir / "latest_summary.json"
         path.write_text(json.dumps(make_summary(timestamp="20240101T120000Z")))
-        exporter.update_metrics()
         assert 'rally_service_status{service="nova"} 1.0' in metrics_output()
         # New run with nova failing — reset file cache so the new content is read
         path.write_text(json.dumps(make_summary(
@@ -308,10 +328,23 @@ class TestUpdateMetrics:
             }
         )))
         exporter._summary_mtime = -1.0  # force cache miss on next load
-        exporter.update_metrics()
         output = metrics_output()
         assert 'rally_service_status{service="nova"} 0.0' in output
 
+    def test_stale_series_removed_on_new_timestamp(self, results_dir):
+        """Label series for services absent from a new summary are dropped."""
+        path = results_dir / "latest_summary.json"
+        two_services = make_summary()["services"]
+        two_services["glance"] = dict(two_services["nova"])
+        path.write_text(json.dumps(make_summary(services=two_services)))
+        assert 'rally_service_status{service="glance"}' in metrics_output()
+        # Next run reports only nova — glance series must disappear
+        path.write_text(json.dumps(make_summary(timestamp="20240101T160000Z")))
+        exporter._summary_mtime = -1.0  # force cache miss on next load
+        output = metrics_output()
+        assert 'rally_service_status{service="glance"}' not in output
+        assert 'rally_service_status{service="nova"} 1.0' in output
+
     def test_cleanup_metrics_update_on_same_summary_timestamp(self, results_dir):
         """Cleanup metrics update even when summary timestamp is unchanged."""
         summary_path = results_dir / "latest_summary.json"
@@ -319,29 +352,26 @@ class TestUpdateMetrics:
 
         summary_path.write_text(json.dumps(make_summary()))
         cleanup_path.write_text(json.dumps(make_cleanup(s_nova=0)))
-        exporter.update_metrics()
         assert 'rally_cleanup_failure{service="nova"} 0.0' in metrics_output()
 
         # Write new cleanup data but keep same summary file (mtime preserved)
         cleanup_path.write_text(json.dumps(make_cleanup(s_nova=3)))
         exporter._cleanup_mtime = -1.0  # force cache miss on cleanup file
-        exporter.update_metrics()
         # Cleanup metric must reflect new value even though summary timestamp unchanged
         assert 'rally_cleanup_failure{service="nova"} 1.0' in metrics_output()
 
     def test_cleanup_metrics_update_when_summary_invalid(self, results_dir):
-        """Cleanup metrics update even when summary file is missing/invalid."""
+        """Cleanup metrics are emitted even when summary file is missing."""
         cleanup_path = results_dir / "cleanup_metrics.json"
         cleanup_path.write_text(json.dumps(make_cleanup(s_nova=2)))
-        # No summary file — update_metrics would otherwise return early
-        exporter.update_metrics()
+        # No summary file — cleanup metrics must still be emitted
         output = metrics_output()
         assert "rally_data_valid 0.0" in output
         assert 'rally_cleanup_failure{service="nova"} 1.0' in output
 
 
 # ---------------------------------------------------------------------------
-# Flask endpoints
+# WSGI endpoints
 # ---------------------------------------------------------------------------
 
 class TestHealthEndpoint:
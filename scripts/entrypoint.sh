@@ -126,7 +126,7 @@ log "Dashboard symlinks updated"
 # Start Prometheus Exporter (background)
 # --------------------------------------------------------------------------
 log "Starting Prometheus exporter on port ${EXPORTER_PORT}..."
-su -s /bin/bash rally -c "cd /exporter && gunicorn -w 1 -b 0.0.0.0:${EXPORTER_PORT} --timeout 30 rally_exporter:app" &
+su -s /bin/bash rally -c "cd /exporter && gunicorn -c gunicorn_conf.py -b 0.0.0.0:${EXPORTER_PORT} rally_exporter:app" &
 EXPORTER_PID=$!
 log "Exporter started (PID: ${EXPORTER_PID})"
 
@@ -1,3 +1,4 @@
+import ast
 import os
 import re
 import secrets
@@ -27,11 +28,19 @@ def _path(rel):
 
 
 def patch_file(path, pattern, replacement):
+    """Apply a compiled regex substitution to a file in place.
+
+    The file is only rewritten when the substitution actually changes it,
+    so re-running against an already-patched tree (or a pattern that no
+    longer matches) does no disk writes.
+    """
     if not os.path.exists(path):
         return
     with open(path, "r") as f:
         content = f.read()
-    new_content = re.sub(pattern, replacement, content)
+    new_content = pattern.sub(replacement, content)
+    if new_content == content:
+        return
     with open(path, "w") as f:
         f.write(new_content)
 
@@ -44,17 +53,26 @@ def inject_after_imports(path, injection):
         content = f.read()
     if injection in content:
         return  # Already patched
-    # Find the last top-level (non-indented) import line and inject after it
-    lines = content.split("\n")
-    last_import_idx = 0
-    for i, line in enumerate(lines):
-        stripped = line.strip()
-        # Only match non-indented imports (top-level)
-        if (stripped.startswith("import ") or stripped.startswith("from ")) and not line[0].isspace():
-            last_import_idx = i
-    lines.insert(last_import_idx + 1, "\n" + injection + "\n")
+    # Locate the last top-level import via the AST (end_lineno handles
+    # multi-line and parenthesized imports correctly), then splice the
+    # injection at that line boundary with a single string slice instead of
+    # splitting, scanning, and re-joining the whole file line by line.
+    tree = ast.parse(content)
+    last_import_line = max(
+        (node.end_lineno for node in tree.body
+         if isinstance(node, (ast.Import, ast.ImportFrom))),
+        default=0,
+    )
+    offset = 0
+    for _ in range(last_import_line):
+        newline = content.find("\n", offset)
+        if newline == -1:
+            offset = len(content)
+            break
+        offset = newline + 1
+    new_content = content[:offset] + "\n" + injection + "\n" + content[offset:]
     with open(path, "w") as f:
-        f.write("\n".join(lines))
+        f.write(new_content)
 
 
 # ==============================================================================
@@ -70,46 +88,48 @@ inject_after_imports(
 
 # ==============================================================================
 # Keystone password policy patches
+# Patterns are compiled once at module load instead of passing raw strings to
+# re.sub() and leaning on the re module's internal pattern cache.
 # ==============================================================================
-
-# Patch keystone_v3.py create_user to ensure generated random passwords have required complexity
-patch_file(
-    _path("rally_openstack/common/services/identity/keystone_v3.py"),
-    r'name=username, password=password,',
-    f'name=username, password=(password or {_STRONG_PWD_EXPR}),',
-)
-
-# Patch keystone_v3.py to disable password expiry and forced password change
-patch_file(
-    _path("rally_openstack/common/services/identity/keystone_v3.py"),
-    r'domain=domain_id, enabled=enabled\)',
-    r'domain=domain_id, enabled=enabled, options={"ignore_change_password_upon_first_use": True, "ignore_password_expiry": True})'
-)
-
-# Patch keystone_v2.py
-patch_file(
-    _path("rally_openstack/common/services/identity/keystone_v2.py"),
-    r'password = password or str\(uuid\.uuid4\(\)\)',
-    f'password = password or {_STRONG_PWD_EXPR}',
-)
-
-# Patch contexts/keystone/users.py
-patch_file(
-    _path("rally_openstack/task/contexts/keystone/users.py"),
-    r'password = \(str\(uuid\.uuid4\(\)\)',
-    f'password = ({_STRONG_PWD_EXPR}',
-)
-
-# Patch scenarios/keystone/basic.py
-patch_file(
-    _path("rally_openstack/task/scenarios/keystone/basic.py"),
-    r'password = self\.generate_random_name\(\)',
-    f'password = {_STRONG_PWD_EXPR}',
-)
-
-# Also patch basic.py create_user to pass a default strong password if kwargs has no password
-patch_file(
-    _path("rally_openstack/task/scenarios/keystone/basic.py"),
-    r'self\.admin_keystone\.create_user\((.*?)\*\*kwargs\)',
-    rf'self.admin_keystone.create_user(\1password=kwargs.pop("password", {_STRONG_PWD_EXPR}), **kwargs)',
-)
+PATCHES = [
+    # keystone_v3.py create_user: ensure generated random passwords have
+    # required complexity
+    (
+        "rally_openstack/common/services/identity/keystone_v3.py",
+        re.compile(r'name=username, password=password,'),
+        f'name=username, password=(password or {_STRONG_PWD_EXPR}),',
+    ),
+    # keystone_v3.py: disable password expiry and forced password change
+    (
+        "rally_openstack/common/services/identity/keystone_v3.py",
+        re.compile(r'domain=domain_id, enabled=enabled\)'),
+        r'domain=domain_id, enabled=enabled, options={"ignore_change_password_upon_first_use": True, "ignore_password_expiry": True})',
+    ),
+    # keystone_v2.py
+    (
+        "rally_openstack/common/services/identity/keystone_v2.py",
+        re.compile(r'password = password or str\(uuid\.uuid4\(\)\)'),
+        f'password = password or {_STRONG_PWD_EXPR}',
+    ),
+    # contexts/keystone/users.py
+    (
+        "rally_openstack/task/contexts/keystone/users.py",
+        re.compile(r'password = \(str\(uuid\.uuid4\(\)\)'),
+        f'password = ({_STRONG_PWD_EXPR}',
+    ),
+    # scenarios/keystone/basic.py
+    (
+        "rally_openstack/task/scenarios/keystone/basic.py",
+        re.compile(r'password = self\.generate_random_name\(\)'),
+        f'password = {_STRONG_PWD_EXPR}',
+    ),
+    # basic.py create_user: pass a default strong password if kwargs has no password
+    (
+        "rally_openstack/task/scenarios/keystone/basic.py",
+        re.compile(r'self\.admin_keystone\.create_user\((.*?)\*\*kwargs\)'),
+        rf'self.admin_keystone.create_user(\1password=kwargs.pop("password", {_STRONG_PWD_EXPR}), **kwargs)',
+    ),
+]
+
+for rel_path, pattern, replacement in PATCHES:
+    patch_file(_path(rel_path), pattern, replacement)